@@ -1,13 +1,17 @@
+import functools
 import os
 import re
+import socket
 import stat
 import tempfile
 import time
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
 
 import backoff
 import paramiko
-import pytz
 import singer
 from paramiko.ssh_exception import AuthenticationException, SSHException
 
@@ -15,6 +19,57 @@ from tap_sftp import decrypt
 
 LOGGER = singer.get_logger()
 
+# Read local copies of downloaded files in 1 MiB chunks; the 8 KiB default
+# means far more syscalls than necessary for multi-GB CSVs
+READ_BUFFER_SIZE = 1 << 20
+
+# Authenticated connections keyed by (host, port, username) so repeated
+# connection() calls within one process reuse the same SSH transport
+# instead of paying the handshake again
+_CONNECTION_POOL = {}
+
+
+class _SubstringMatcher:
+    """Matches a literal pattern with a plain substring test instead of the regex engine."""
+
+    def __init__(self, literal):
+        self.literal = literal
+
+    def search(self, text):
+        return self.literal in text
+
+
+# File suffixes (as they appear at the end of search_pattern regexes) whose
+# contents are already compressed, making zlib on the transport pure CPU waste.
+# The dot is required, optionally regex-escaped as it is in patterns like
+# 'Export.*\.zip\.gpg$', so names merely ending in 'gz' etc. don't count
+_PRECOMPRESSED_SUFFIX = re.compile(r'\\?\.(gz|zip|bz2|pgp|gpg|parquet)\$?$')
+
+
+def _should_compress(config):
+    """ Resolves the top-level 'compression' config (auto|on|off) to a bool. On
+        auto, transport compression is turned off when every table's search_pattern
+        targets already-compressed files. """
+    mode = config.get('compression', 'auto')
+    if mode == 'on':
+        return True
+    if mode == 'off':
+        return False
+
+    patterns = [table.get('search_pattern', '') for table in config.get('tables') or []]
+    return not (patterns and all(_PRECOMPRESSED_SUFFIX.search(pattern) for pattern in patterns))
+
+
+@functools.lru_cache(maxsize=128)
+def _compiled(pattern):
+    """Compile a search pattern once and reuse it across matching calls.
+
+    Patterns without any regex metacharacters skip compilation entirely and
+    match by substring, which is what re.search degenerates to for them."""
+    if re.escape(pattern) == pattern:
+        return _SubstringMatcher(pattern)
+    return re.compile(pattern)
+
 
 def handle_backoff(details):
     LOGGER.warn(
@@ -23,11 +78,12 @@ def handle_backoff(details):
 
 
 class SFTPConnection():
-    def __init__(self, host, username, password=None, private_key_file=None, port=None):
+    def __init__(self, host, username, password=None, private_key_file=None, port=None, use_compression=True):
         self.host = host
         self.username = username
         self.password = password
         self.port = int(port or 22)
+        self.use_compression = use_compression
         self.decrypted_file = None
         self.key = None
         self.transport = None
@@ -50,18 +106,36 @@ class SFTPConnection():
     def __connect(self):
         try:
             LOGGER.info('Creating new connection to SFTP...')
-            self.transport = paramiko.Transport((self.host, self.port))
-            self.transport.use_compression(True)
+            self.transport = self.__build_transport()
             self.transport.connect(username=self.username, password=self.password, hostkey=None, pkey=self.key)
+            # Ping the server while long CSV reads keep the channel quiet so
+            # idle timeouts don't snap the transport mid-sync
+            self.transport.set_keepalive(30)
             self.__sftp = paramiko.SFTPClient.from_transport(self.transport)
             LOGGER.info('Connection successful')
         except (AuthenticationException, SSHException) as ex:
             self.transport.close()
-            self.transport = paramiko.Transport((self.host, self.port))
-            self.transport.use_compression(True)
+            self.transport = self.__build_transport()
             self.transport.connect(username=self.username, password=self.password, hostkey=None, pkey=None)
+            self.transport.set_keepalive(30)
             self.__sftp = paramiko.SFTPClient.from_transport(self.transport)
 
+    def __build_transport(self):
+        transport = paramiko.Transport((self.host, self.port))
+        # Defaults are tuned for low-latency links; a bigger flow-control window
+        # and packet size keep reads streaming instead of stalling on ACKs when
+        # the bandwidth-delay product is high
+        transport.default_window_size = 4 * 1024 * 1024
+        transport.default_max_packet_size = 256 * 1024
+        transport.use_compression(self.use_compression)
+        # The SFTP request/response exchange is latency sensitive; don't let
+        # Nagle hold small packets back
+        transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return transport
+
+    def is_active(self):
+        return self.transport is not None and self.transport.is_active()
+
     @property
     def sftp(self):
         # self.__connect()
@@ -72,16 +146,22 @@ class SFTPConnection():
         self.__sftp = sftp
 
     def close(self):
-        self.sftp.close()
-        self.transport.close()
+        # Idempotent: a second call (caller cleanup plus pool teardown) must not
+        # send another SSH disconnect or re-close the decrypted handle
+        if self.__sftp is not None:
+            self.__sftp.close()
+            self.__sftp = None
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
         # decrypted files require an open file object, so close it
         if self.decrypted_file:
             self.decrypted_file.close()
+            self.decrypted_file = None
 
     def match_files_for_table(self, files, table_name, search_pattern):
-        LOGGER.info("Searching for files for table '%s', matching pattern: %s", table_name, table_pattern)
-        matcher = re.compile(search_pattern)
-        return [f for f in files if matcher.search(f["filepath"])]
+        LOGGER.info("Searching for files for table '%s', matching pattern: %s", table_name, search_pattern)
+        return self.get_files_matching_pattern(files, search_pattern)
 
     def is_empty(self, file_attr):
         return file_attr.st_size == 0
@@ -89,10 +169,14 @@ class SFTPConnection():
     def is_directory(self, file_attr):
         return stat.S_ISDIR(file_attr.st_mode)
 
-    def get_files_by_prefix(self, prefix):
+    def get_files_by_prefix(self, prefix, matcher=None, modified_since=None):
         """
         Accesses the underlying file system and gets all files that match "prefix", in this case, a directory path.
 
+        Filters are applied as the listing streams in, cheapest first: the
+        "modified_since" timestamp compare runs before the optional compiled regex
+        "matcher", so entries dropped by either never allocate a file dict.
+
         Returns a list of filepaths from the root.
         """
         files = []
@@ -100,40 +184,52 @@ class SFTPConnection():
         if prefix is None or prefix == '':
             prefix = '.'
 
-        try:
-            result = self.sftp.listdir_attr(prefix)
-        except FileNotFoundError as e:
-            raise Exception("Directory '{}' does not exist".format(prefix)) from e
-
-        for file_attr in result:
-            # NB: This only looks at the immediate level beneath the prefix directory
-            if self.is_directory(file_attr):
-                files += self.get_files_by_prefix(prefix + '/' + file_attr.filename)
-            else:
-                if self.is_empty(file_attr):
-                    continue
-
-                last_modified = file_attr.st_mtime
-                if last_modified is None:
-                    LOGGER.warning("Cannot read m_time for file %s, defaulting to current epoch time",
-                                   os.path.join(prefix, file_attr.filename))
-                    last_modified = datetime.utcnow().timestamp()
-
-                # NB: SFTP specifies path characters to be '/'
-                #     https://tools.ietf.org/html/draft-ietf-secsh-filexfer-13#section-6
-                files.append({"filepath": prefix + '/' + file_attr.filename,
-                              "last_modified": datetime.utcfromtimestamp(last_modified).replace(tzinfo=pytz.UTC)})
+        cutoff = modified_since.timestamp() if modified_since is not None else None
+
+        # Iterative breadth-first walk; recursing per directory builds a throwaway
+        # list for every level of a deep tree
+        dirs = deque([prefix])
+        while dirs:
+            current = dirs.popleft()
+
+            try:
+                # listdir_iter yields attributes as READDIR responses arrive instead
+                # of materializing huge directories up front
+                for file_attr in self.sftp.listdir_iter(current):
+                    if self.is_directory(file_attr):
+                        dirs.append(current + '/' + file_attr.filename)
+                    else:
+                        if self.is_empty(file_attr):
+                            continue
+
+                        last_modified = file_attr.st_mtime
+                        if last_modified is None:
+                            LOGGER.warning("Cannot read m_time for file %s, defaulting to current epoch time",
+                                           os.path.join(current, file_attr.filename))
+                            last_modified = time.time()
+
+                        # A float compare is far cheaper than a regex search, so an
+                        # incremental run discards old files before matching them
+                        if cutoff is not None and last_modified <= cutoff:
+                            continue
+
+                        # NB: SFTP specifies path characters to be '/'
+                        #     https://tools.ietf.org/html/draft-ietf-secsh-filexfer-13#section-6
+                        filepath = current + '/' + file_attr.filename
+                        if matcher is not None and not matcher.search(filepath):
+                            continue
+
+                        files.append({"filepath": filepath,
+                                      "last_modified": datetime.fromtimestamp(last_modified, tz=timezone.utc)})
+            except FileNotFoundError as e:
+                raise Exception("Directory '{}' does not exist".format(current)) from e
 
         return files
 
     def get_files(self, prefix, search_pattern, modified_since=None):
-        files = self.get_files_by_prefix(prefix)
-        if files:
-            LOGGER.info('Found %s files in "%s"', len(files), prefix)
-        else:
-            LOGGER.warning('Found no files on specified SFTP server at "%s"', prefix)
-
-        matching_files = self.get_files_matching_pattern(files, search_pattern)
+        LOGGER.info(f"Searching for files for matching pattern: {search_pattern}")
+        matching_files = self.get_files_by_prefix(prefix, matcher=_compiled(search_pattern),
+                                                  modified_since=modified_since)
 
         if matching_files:
             LOGGER.info('Found %s files in "%s" matching "%s"', len(matching_files), prefix, search_pattern)
@@ -143,48 +239,110 @@ class SFTPConnection():
         for f in matching_files:
             LOGGER.info("Found file: %s", f['filepath'])
 
-        if modified_since is not None:
-            matching_files = [f for f in matching_files if f["last_modified"] > modified_since]
-
         return matching_files
 
-    def get_file_handle(self, f, decryption_configs=None):
-        """ Takes a file dict {"filepath": "...", "last_modified": "..."} and returns a handle to the file. """
+    def get_file_handle(self, f, decryption_configs=None, own_channel=False):
+        """ Takes a file dict {"filepath": "...", "last_modified": "..."} and returns a handle to the file.
+
+            Call this on the same connection used for get_files so every file in a run shares one
+            authenticated transport; the SSH handshake dwarfs the cost of any individual transfer.
+
+            Pass own_channel=True when calling from multiple threads: the shared SFTPClient
+            serializes requests but not channel reads, so each concurrent download must run
+            on its own channel off the shared transport. """
+        if own_channel:
+            sftp = paramiko.SFTPClient.from_transport(self.transport)
+            try:
+                return self.__get_file_handle(sftp, f, decryption_configs)
+            finally:
+                sftp.close()
+        return self.__get_file_handle(self.sftp, f, decryption_configs)
+
+    def __get_file_handle(self, sftp, f, decryption_configs):
         with tempfile.TemporaryDirectory() as tmpdirname:
             sftp_file_path = f["filepath"]
             local_path = f'{tmpdirname}/{os.path.basename(sftp_file_path)}'
             if decryption_configs:
                 LOGGER.info(f'Decrypting file: {sftp_file_path}')
                 # Getting sftp file to local, then reading it is much faster than reading it directly from the SFTP
-                self.sftp.get(sftp_file_path, local_path)
-                decrypted_path = decrypt.gpg_decrypt(
+                sftp.get(sftp_file_path, local_path)
+                decrypted_name = os.path.splitext(os.path.basename(sftp_file_path))[0]
+                if decrypted_name.endswith('.zip'):
+                    # zip archives need a seekable handle, so those still decrypt to disk
+                    decrypted_path = decrypt.gpg_decrypt(
+                        local_path,
+                        tmpdirname,
+                        decryption_configs.get('key'),
+                        decryption_configs.get('gnupghome'),
+                        decryption_configs.get('passphrase')
+                    )
+                    LOGGER.info(f'Decrypting file complete')
+                    try:
+                        self.decrypted_file = open(decrypted_path, 'rb', buffering=READ_BUFFER_SIZE)
+                    except FileNotFoundError:
+                        raise Exception(f'Decryption of file failed: {sftp_file_path}')
+                    return self.decrypted_file, decrypted_path
+                # Everything else streams straight off gpg's stdout, overlapping
+                # decryption with the CSV parse and skipping the plaintext temp file
+                self.decrypted_file = decrypt.gpg_decrypt_stream(
                     local_path,
-                    tmpdirname,
                     decryption_configs.get('key'),
                     decryption_configs.get('gnupghome'),
                     decryption_configs.get('passphrase')
                 )
-                LOGGER.info(f'Decrypting file complete')
-                try:
-                    self.decrypted_file = open(decrypted_path, 'rb')
-                except FileNotFoundError:
-                    raise Exception(f'Decryption of file failed: {sftp_file_path}')
-                return self.decrypted_file, decrypted_path
+                return self.decrypted_file, decrypted_name
             else:
-                self.sftp.get(sftp_file_path, local_path)
-                return open(local_path, 'rb')
+                sftp.get(sftp_file_path, local_path)
+                return open(local_path, 'rb', buffering=READ_BUFFER_SIZE)
 
     def get_files_matching_pattern(self, files, pattern):
         """ Takes a file dict {"filepath": "...", "last_modified": "..."} and a regex pattern string, and returns
             files matching that pattern. """
-        matcher = re.compile(pattern)
+        matcher = _compiled(pattern)
         LOGGER.info(f"Searching for files for matching pattern: {pattern}")
         return [f for f in files if matcher.search(f["filepath"])]
 
 
+def iter_files_parallel(conn, files, max_workers=4):
+    """ Downloads up to max_workers files concurrently over the shared transport and
+        yields (file, handle) pairs in the original file order, so upcoming transfers
+        overlap with the CPU-bound parsing of the current file. Each download opens its
+        own SFTP channel (own_channel=True) because the shared SFTPClient cannot serve
+        concurrent transfers; concurrency stays small to respect typical sshd
+        MaxSessions limits. """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        file_iter = iter(files)
+        pending = deque((f, executor.submit(conn.get_file_handle, f, own_channel=True))
+                        for f in islice(file_iter, max_workers))
+
+        while pending:
+            f, future = pending.popleft()
+            handle = future.result()
+            # Refill before yielding so the next download runs while the
+            # caller processes this file
+            for next_file in islice(file_iter, 1):
+                pending.append((next_file, executor.submit(conn.get_file_handle, next_file, own_channel=True)))
+            yield f, handle
+
+
 def connection(config):
-    return SFTPConnection(config['host'],
+    """ Returns a pooled SFTPConnection for the config, reconnecting only when the
+        cached transport has gone away. """
+    use_compression = _should_compress(config)
+    # The credentials belong in the key: a config with rotated secrets must not
+    # silently reuse a connection authenticated with the old ones
+    key = (config['host'], int(config.get('port') or 22), config['username'],
+           config.get('password'), config.get('private_key_file'), use_compression)
+
+    conn = _CONNECTION_POOL.get(key)
+    if conn is not None and conn.is_active():
+        return conn
+
+    conn = SFTPConnection(config['host'],
                           config['username'],
                           password=config.get('password'),
                           private_key_file=config.get('private_key_file'),
-                          port=config.get('port'))
+                          port=config.get('port'),
+                          use_compression=use_compression)
+    _CONNECTION_POOL[key] = conn
+    return conn
@@ -1,8 +1,95 @@
 import os
+import subprocess
+import threading
+from collections import deque
 
 import gnupg
 
 
+class GPGStream:
+    """File-like wrapper over gpg's stdout pipe that keeps stderr drained so gpg
+    can never block on a full pipe, and reaps the process on close."""
+
+    def __init__(self, proc, src_file_path):
+        self._proc = proc
+        self._src_file_path = src_file_path
+        self._eof = False
+        self._closed = False
+        self._stderr_tail = deque(maxlen=20)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in self._proc.stderr:
+            self._stderr_tail.append(line)
+
+    def _decrypt_error(self):
+        self._proc.wait()
+        self._stderr_thread.join(timeout=5)
+        stderr = b''.join(self._stderr_tail).decode(errors='replace').strip()
+        return Exception(f'Decryption of file failed: {self._src_file_path} ({stderr})')
+
+    def read(self, size=-1):
+        data = self._proc.stdout.read(size)
+        if not data and size != 0:
+            self._eof = True
+        return data
+
+    def readinto(self, b):
+        count = self._proc.stdout.readinto(b)
+        if count == 0 and len(b) > 0:
+            self._eof = True
+        return count
+
+    def __getattr__(self, name):
+        return getattr(self._proc.stdout, name)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._proc.stdout.close()
+        if not self._eof:
+            # The consumer abandoned the stream before EOF; stop gpg rather
+            # than treating the truncation as a decrypt failure
+            self._proc.terminate()
+            self._proc.wait()
+            return
+        # A nonzero exit after full consumption means gpg failed mid-stream
+        # and the plaintext is truncated; don't let that pass silently
+        if self._proc.wait() != 0:
+            raise self._decrypt_error()
+
+
+def gpg_decrypt_stream(src_file_path, key, gnupghome, passphrase):
+    """Decrypts src_file_path and returns a file object streaming the plaintext straight
+    from gpg's stdout, so large files never hit disk a second time."""
+    initialize_gpg(key, gnupghome)
+
+    args = ['gpg', '--batch', '--yes', '--quiet',
+            '--homedir', gnupghome,
+            '--pinentry-mode', 'loopback', '--passphrase-fd', '0',
+            '--decrypt', src_file_path]
+    proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, bufsize=1 << 20)
+    # Wrap immediately so the stderr drain is running before gpg can fill that pipe
+    stream = GPGStream(proc, src_file_path)
+
+    try:
+        proc.stdin.write((passphrase or '').encode() + b'\n')
+        proc.stdin.close()
+    except BrokenPipeError:
+        # gpg exited before reading the passphrase
+        raise stream._decrypt_error() from None
+
+    # Block until gpg produces output or exits, so a bad key or passphrase
+    # surfaces here rather than as a truncated read downstream
+    if not proc.stdout.peek(1) and proc.wait() != 0:
+        raise stream._decrypt_error()
+
+    return stream
+
+
 def gpg_decrypt_to_file(gpg, src_file_path, decrypted_path, passphrase):
     with open(src_file_path, 'rb') as file_obj:
         gpg.decrypt_file(file_obj, output=decrypted_path, passphrase=passphrase)
@@ -1,15 +1,98 @@
 import codecs
 import csv
+import functools
 import io
 import os
+import queue
 import re
+import threading
 
 from tap_sftp import decrypt
 from tap_sftp.singer_encodings import compression
 
+try:
+    import pyarrow
+    from pyarrow import csv as pyarrow_csv
+except ImportError:
+    pyarrow = None
+    pyarrow_csv = None
+
 SDC_EXTRA_COLUMN = "_sdc_extra"
 SDC_META_COLUMNS = ['_sdc_source_file', '_sdc_source_lineno']
 
+# Decode in 1 MiB blocks instead of TextIOWrapper's 8 KiB default so the
+# unicode decoder keeps pace with large buffered reads
+BUFFER_SIZE = 1 << 20
+
+# Compiled once at import so the per-column sanitize loop doesn't re-parse the patterns
+_COLNAME_SUB = re.compile(r'[^0-9a-zA-Z_]+')
+_COLNAME_PREFIX = re.compile(r'^(\d+)')
+
+# Fast path for all-ASCII headers: translate disallowed characters to NUL in one
+# C-level pass, then collapse each NUL run to a single underscore like the regex does
+_SANITIZE_TABLE = str.maketrans({chr(c): '\x00' for c in range(128)
+                                 if not (chr(c).isalnum() or chr(c) == '_')})
+_NUL_RUN = re.compile('\x00+')
+
+
+class ThreadedRowReader:
+    """Runs a row reader in a daemon thread feeding a bounded queue, so reading
+    and parsing the stream overlaps with the caller's transform-and-write loop."""
+
+    _DONE = object()
+
+    def __init__(self, reader, maxsize=64):
+        self._reader = reader
+        # Resolve the header here so the producer never races the caller on it
+        self.fieldnames = reader.fieldnames
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self):
+        try:
+            for row in self._reader:
+                self._put(row)
+                if self._stopped.is_set():
+                    return
+            self._put(self._DONE)
+        except Exception as exc:
+            self._put(exc)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = self._queue.get()
+        if item is self._DONE:
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        """ Stops the producer thread and closes the wrapped reader; call when
+        abandoning the reader before it is exhausted. """
+        self._stopped.set()
+        # Free a queue slot so a producer blocked on put() can see the stop flag
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join(timeout=5)
+        close = getattr(self._reader, 'close', None)
+        if close is not None:
+            close()
+
 
 def get_row_iterators(iterable, options={}, infer_compression=False):
     """Accepts an interable, options and a flag to infer compression and yields
@@ -17,43 +100,197 @@ def get_row_iterators(iterable, options={}, infer_compression=False):
     if infer_compression:
         compressed_iterables = compression.infer(iterable, options.get('file_name'))
     for item in compressed_iterables:
-        yield get_row_iterator(item, options=options)
+        reader = get_row_iterator(item, options=options)
+        if options.get('parse_in_thread', True):
+            reader = ThreadedRowReader(reader)
+        yield reader
 
 
 def sanitize_colname(col_name):
-    sanitized = re.sub(r'[^0-9a-zA-Z_]+', '_', col_name)
-    prefixed = re.sub(r'^(\d+)', r'x_\1', sanitized)
+    if col_name.isascii():
+        sanitized = col_name.translate(_SANITIZE_TABLE)
+        if '\x00' in sanitized:
+            sanitized = _NUL_RUN.sub('_', sanitized)
+        if sanitized[:1].isdigit():
+            sanitized = 'x_' + sanitized
+        return sanitized.lower()
+
+    sanitized = _COLNAME_SUB.sub('_', col_name)
+    prefixed = _COLNAME_PREFIX.sub(r'x_\1', sanitized)
     return prefixed.lower()
 
 
+@functools.lru_cache(maxsize=32)
+def _row_factory(fieldnames):
+    """Compiles a dict builder specialized to one header: the literal-keyed dict
+    display skips zip() and lets CPython pre-size the hash table. Cached on the
+    header tuple so files sharing a schema share the compiled function."""
+    src = 'def _make(row):\n    return {%s}' % ', '.join(
+        '{!r}: row[{}]'.format(name, index) for index, name in enumerate(fieldnames))
+    namespace = {}
+    exec(src, namespace)
+    return namespace['_make']
+
+
+class CSVRowReader:
+    """DictReader-compatible wrapper over csv.reader that shares one fieldnames
+    sequence across every row instead of DictReader's per-row restkey bookkeeping."""
+
+    def __init__(self, textio, delimiter=','):
+        self._textio = textio
+        self.reader = csv.reader(textio, delimiter=delimiter)
+        self._fieldnames = None
+        self._make = None
+
+    @property
+    def fieldnames(self):
+        if self._fieldnames is None:
+            header = next(self.reader, None)
+            self._fieldnames = tuple(header) if header is not None else None
+        return self._fieldnames
+
+    @fieldnames.setter
+    def fieldnames(self, value):
+        # Frozen as a tuple: no list over-allocation, and hashable so identical
+        # headers can share caches across files
+        self._fieldnames = tuple(value) if value is not None else None
+        self._make = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        fieldnames = self.fieldnames
+        row = next(self.reader)
+        # DictReader skips fully blank rows, so keep doing that
+        while not row:
+            row = next(self.reader)
+
+        # Fast path: the row is exactly as wide as the header
+        n = len(fieldnames)
+        if len(row) == n:
+            make = self._make
+            if make is None:
+                make = self._make = _row_factory(fieldnames)
+            return make(row)
+
+        if len(row) < n:
+            record = dict(zip(fieldnames, row))
+            for key in fieldnames[len(row):]:
+                record[key] = None
+            return record
+
+        record = dict(zip(fieldnames, row))
+        record[SDC_EXTRA_COLUMN] = row[n:]
+        return record
+
+    def close(self):
+        # Resolve the header first so fieldnames stays readable after close,
+        # which discovery's empty-file fallback relies on
+        _ = self.fieldnames
+        self._textio.close()
+
+
+class ArrowRowReader:
+    """Streams rows through pyarrow's C CSV reader, yielding one dict per row
+    like csv.DictReader but parsing whole blocks at a time."""
+
+    def __init__(self, iterable, options):
+        encoding = options.get('encoding', 'utf-8')
+        delimiter = options.get('delimiter', ',')
+        self._file_name = options.get('file_name')
+        self._source = iterable
+
+        for i in range(options.get('skip_rows', 0)):
+            iterable.readline()
+
+        # Consume the header ourselves so every column can be pinned to string,
+        # matching the values DictReader produces
+        header = iterable.readline().decode(encoding)
+        self.fieldnames = tuple(next(csv.reader([header], delimiter=delimiter), ()))
+        if not self.fieldnames:
+            raise Exception(f'CSV file has no header row and cannot be parsed with use_pyarrow: {self._file_name}')
+
+        try:
+            self._reader = pyarrow_csv.open_csv(
+                iterable,
+                read_options=pyarrow_csv.ReadOptions(block_size=8 << 20,
+                                                     column_names=self.fieldnames,
+                                                     encoding=encoding),
+                parse_options=pyarrow_csv.ParseOptions(delimiter=delimiter),
+                convert_options=pyarrow_csv.ConvertOptions(
+                    column_types={name: pyarrow.string() for name in self.fieldnames})
+            )
+        except pyarrow.ArrowInvalid as exc:
+            raise self._parse_error(exc)
+
+    def _parse_error(self, exc):
+        return Exception(
+            'pyarrow could not parse {}: {}. Rows that do not match the header width '
+            '(including _sdc_extra overflow) are only supported by the default reader; '
+            'disable use_pyarrow for this table.'.format(self._file_name, exc))
+
+    def __iter__(self):
+        try:
+            for batch in self._reader:
+                yield from batch.to_pylist()
+        except pyarrow.ArrowInvalid as exc:
+            raise self._parse_error(exc)
+
+    def close(self):
+        self._reader.close()
+        self._source.close()
+
+
 def get_row_iterator(iterable, options=None):
     """Accepts an interable, options and returns a csv.DictReader object
     which can be used to yield CSV rows."""
     options = options or {}
 
+    # Opt-in vectorized path; sanitize_header keeps the DictReader semantics below
+    if options.get('use_pyarrow') and not options.get('sanitize_header'):
+        if pyarrow_csv is None:
+            raise Exception('use_pyarrow is enabled but pyarrow is not installed')
+        return _check_key_properties(ArrowRowReader(iterable, options), options)
+
     for i in range(options.get('skip_rows', 0)):
         iterable.__next__()
 
-    # Replace any NULL bytes in the line given to the DictReader
-    reader = csv.DictReader(
-        io.TextIOWrapper(iterable, encoding=options.get('encoding', 'utf-8')),
-        fieldnames=None,
-        restkey=SDC_EXTRA_COLUMN,
+    # newline='' hands line-ending handling to the csv module as its docs require,
+    # and errors='replace' keeps a stray bad byte from aborting a multi-GB sync
+    reader = CSVRowReader(
+        io.TextIOWrapper(io.BufferedReader(iterable, buffer_size=BUFFER_SIZE),
+                         encoding=options.get('encoding', 'utf-8'),
+                         newline='',
+                         errors='replace'),
         delimiter=options.get('delimiter', ',')
     )
 
     if 'sanitize_header' in options and options['sanitize_header']:
-        reader.fieldnames = [sanitize_colname(col) for col in reader.fieldnames].copy()
+        reader.fieldnames = tuple(sanitize_colname(col) for col in reader.fieldnames)
+
+    return _check_key_properties(reader, options)
+
+
+def _header_set(reader):
+    if reader.fieldnames is None:
+        raise Exception('CSV file is empty and has no headers to validate')
+    return set(reader.fieldnames) | set(SDC_META_COLUMNS)
+
 
-    headers = set(reader.fieldnames + SDC_META_COLUMNS)
+def _check_key_properties(reader, options):
+    # Built lazily; configs setting neither option skip the set build entirely
+    headers = None
 
     if options.get('key_properties'):
+        headers = _header_set(reader)
         key_properties = set(options['key_properties'])
         if not key_properties.issubset(headers):
             raise Exception('CSV file missing required headers: {}'
                             .format(key_properties - headers))
 
     if options.get('date_overrides'):
+        headers = headers or _header_set(reader)
         date_overrides = set(options['date_overrides'])
         if not date_overrides.issubset(headers):
             raise Exception('CSV file missing date_overrides headers: {}'
@@ -43,7 +43,9 @@ def sample_file(conn, table_spec, f, sample_rate, max_records, config):
             'file_name': f['filepath'],
             'encoding': table_spec.get('encoding', 'utf-8'),
             'sanitize_header': table_spec.get('sanitize_header', False),
-            'skip_rows': table_spec.get('skip_rows', 0)}
+            'skip_rows': table_spec.get('skip_rows', 0),
+            'use_pyarrow': table_spec.get('use_pyarrow', False),
+            'parse_in_thread': table_spec.get('parse_in_thread', True)}
 
     readers = csv_handler.get_row_iterators(file_handle, options=opts, infer_compression=True)
 
@@ -60,6 +62,10 @@ def sample_file(conn, table_spec, f, sample_rate, max_records, config):
             if len(samples) >= max_records:
                 break
 
+        # Sampling usually abandons the reader well before the file ends, so
+        # shut down the background parser and release the handle explicitly
+        reader.close()
+
     # Empty sample to show field selection, if needed
     empty_file = False
     if len(samples) == 0:
@@ -39,8 +39,15 @@ def sync_stream(config, state, stream, sftp_client):
     if not files:
         return records_streamed
 
-    for sftp_file in files:
-        records_streamed += sync_file(sftp_file, stream, table_spec, config, sftp_client)
+    if config.get('decryption_configs') or len(files) == 1:
+        # Decryption manages its own handles per file, so nothing to prefetch
+        file_iter = ((sftp_file, None) for sftp_file in files)
+    else:
+        # Download upcoming files while the current one is being parsed
+        file_iter = client.iter_files_parallel(sftp_client, files)
+
+    for sftp_file, file_handle in file_iter:
+        records_streamed += sync_file(sftp_file, stream, table_spec, config, sftp_client, file_handle=file_handle)
         state = singer.write_bookmark(state, table_name, 'modified_since', sftp_file['last_modified'].isoformat())
         singer.write_state(state)
 
@@ -49,14 +56,14 @@ def sync_stream(config, state, stream, sftp_client):
     return records_streamed
 
 
-def sync_file(sftp_file_spec, stream, table_spec, config, sftp_client):
+def sync_file(sftp_file_spec, stream, table_spec, config, sftp_client, file_handle=None):
     LOGGER.info('Syncing file "%s".', sftp_file_spec["filepath"])
     decryption_configs = config.get('decryption_configs')
     if decryption_configs:
         decryption_configs['key'] = AWS_SSM.get_decryption_key(decryption_configs.get('SSM_key_name'))
         file_handle, decrypted_name = sftp_client.get_file_handle(sftp_file_spec, decryption_configs)
         sftp_file_spec['filepath'] = decrypted_name
-    else:
+    elif file_handle is None:
         file_handle = sftp_client.get_file_handle(sftp_file_spec)
 
     # Add file_name to opts and flag infer_compression to support gzipped files
@@ -65,7 +72,9 @@ def sync_file(sftp_file_spec, stream, table_spec, config, sftp_client):
             'file_name': sftp_file_spec['filepath'],
             'encoding': table_spec.get('encoding', 'utf-8'),
             'sanitize_header': table_spec.get('sanitize_header', False),
-            'skip_rows': table_spec.get('skip_rows', False)}
+            'skip_rows': table_spec.get('skip_rows', False),
+            'use_pyarrow': table_spec.get('use_pyarrow', False),
+            'parse_in_thread': table_spec.get('parse_in_thread', True)}
 
     readers = csv_handler.get_row_iterators(file_handle, options=opts, infer_compression=True)
 
@@ -90,6 +99,7 @@ def sync_file(sftp_file_spec, stream, table_spec, config, sftp_client):
                 if records_synced % 100000 == 0:
                     LOGGER.info(f'Synced Record Count: {records_synced}')
         LOGGER.info(f'Sync Complete - Records Synced: {records_synced}')
+        reader.close()
 
     stats.add_file_data(table_spec, sftp_file_spec['filepath'], sftp_file_spec['last_modified'], records_synced)
 
@@ -2,6 +2,7 @@ from datetime import datetime
 from unittest.mock import patch
 
 import pytest
+from tap_sftp import client
 from tests.configuration.fixtures import get_sample_file_path, sftp_client
 
 
@@ -13,12 +14,32 @@ def test_get_file_handle(patch_temp, sftp_client):
     sftp_client.get_file_handle({'filepath': '/fake_file.txt'})
 
 
-@patch('tap_sftp.decrypt.gpg_decrypt', return_value=get_sample_file_path('fake_file.txt'))
+@patch('tap_sftp.client.SFTPConnection.get_file_handle', side_effect=lambda f, **kwargs: f['filepath'])
+def test_iter_files_parallel(patch_handle, sftp_client):
+    """
+        Handles come back paired with their file dicts in the original order
+    """
+    files = [{'filepath': f'/Export/file_{i}.csv'} for i in range(5)]
+    results = list(client.iter_files_parallel(sftp_client, files, max_workers=2))
+    assert results == [(f, f['filepath']) for f in files]
+
+
+@patch('tap_sftp.decrypt.gpg_decrypt_stream')
 def test_get_file_handle_decrypt(patch_decrypt, sftp_client):
     """
-        File handle of gpg file calls the decrypt method
+        File handle of gpg file streams through the decrypt method
+    """
+    with open(get_sample_file_path('fake_file.txt'), 'rb') as f:
+        patch_decrypt.return_value = f
+        sftp_client.get_file_handle({'filepath': '/path'}, {'key': 'key', 'gnupghome': 'gnupghome', 'passphrase': 'passphrase'})
+    patch_decrypt.assert_called()
+
+@patch('tap_sftp.decrypt.gpg_decrypt', return_value=get_sample_file_path('fake_file.txt'))
+def test_get_file_handle_decrypt_zip(patch_decrypt, sftp_client):
+    """
+        Zipped gpg files need a seekable handle and decrypt to disk
     """
-    sftp_client.get_file_handle({'filepath': '/path'}, {'key': 'key', 'gnupghome': 'gnupghome', 'passphrase': 'passphrase'})
+    sftp_client.get_file_handle({'filepath': '/path.zip.gpg'}, {'key': 'key', 'gnupghome': 'gnupghome', 'passphrase': 'passphrase'})
     patch_decrypt.assert_called()
 
 @patch('tap_sftp.decrypt.gpg_decrypt')
@@ -28,4 +49,4 @@ def test_get_file_handle_decrypt_failed(patch_decrypt, sftp_client):
     """
     patch_decrypt.return_value = get_sample_file_path('doesnt_exist.txt')
     with pytest.raises(Exception):
-        sftp_client.get_file_handle({'filepath': '/path'}, {'key': 'key', 'gnupghome': 'gnupghome', 'passphrase': 'passphrase'})
+        sftp_client.get_file_handle({'filepath': '/path.zip.gpg'}, {'key': 'key', 'gnupghome': 'gnupghome', 'passphrase': 'passphrase'})
@@ -1,3 +1,7 @@
+import io
+
+import pytest
+
 from tap_sftp.singer_encodings import csv_handler
 from tests.configuration.fixtures import get_sample_file_path
 
@@ -14,7 +18,7 @@ def test_sanitize_header():
 
 
 
-    assert parser.fieldnames == ['id', 'col_2_']
+    assert parser.fieldnames == ('id', 'col_2_')
 
 
 def test_no_sanitized_headers():
@@ -29,7 +33,37 @@ def test_no_sanitized_headers():
 
         parser = csv_handler.get_row_iterator(file, options=options)
         
-    assert parser.fieldnames == ['id', 'Col($2)']
+    assert parser.fieldnames == ('id', 'Col($2)')
+
+
+def test_pyarrow_rows():
+    """Test the vectorized parser yields the same rows as DictReader."""
+    pytest.importorskip('pyarrow')
+    options = {
+        'delimiter': ',',
+        'use_pyarrow': True,
+    }
+
+    with open(get_sample_file_path('fake_file.txt'), 'rb') as file:
+        parser = csv_handler.get_row_iterator(file, options=options)
+        rows = list(parser)
+
+    assert parser.fieldnames == ('Col1', 'Col2')
+    assert rows == [{'Col1': 'data1', 'Col2': 'data2'}]
+
+
+def test_pyarrow_ragged_rows():
+    """Ragged rows need the default reader and fail with a pointer to the flag."""
+    pytest.importorskip('pyarrow')
+    options = {
+        'delimiter': ',',
+        'use_pyarrow': True,
+        'file_name': 'ragged.csv',
+    }
+
+    with pytest.raises(Exception, match='use_pyarrow'):
+        parser = csv_handler.get_row_iterator(io.BytesIO(b'id,col1\n1,2,3\n'), options=options)
+        list(parser)
 
 
 def test_skip_header():
@@ -44,4 +78,4 @@ def test_skip_header():
 
         parser = csv_handler.get_row_iterator(file, options=options)
 
-    assert parser.fieldnames == ['id', 'col1']
\ No newline at end of file
+    assert parser.fieldnames == ('id', 'col1')
\ No newline at end of file